@@ -1,12 +1,36 @@
 import tempfile
 import streamlit as st
 import pandas as pd
+import jinja2
+import openpyxl
 from docxtpl import DocxTemplate
-from zipfile import ZipFile
+from pypdf import PdfReader, PdfWriter
+from zipfile import ZIP_STORED, ZipFile, ZipInfo
+import atexit
+import copy
+import hashlib
+import io
 import os
+import queue
+import shutil
 import subprocess
 import logging
-from typing import Dict, Any, List, Optional
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    # python-uno solo existe dentro del Python que distribuye LibreOffice;
+    # si no está, se usa la conversión por lotes vía subprocess.
+    import uno
+    from com.sun.star.beans import PropertyValue
+
+    UNO_AVAILABLE = True
+except ImportError:
+    UNO_AVAILABLE = False
+
+UNO_PORT = 2002
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -18,8 +42,55 @@ st.set_page_config(
 )
 
 
+# Únicas columnas que usa la plantilla
+DATA_COLUMNS = ["Nombre Completo", "Cargo"]
+
+
+@st.cache_data(show_spinner=False)
+def load_data(file_bytes: bytes, file_name: str) -> pd.DataFrame:
+    """Carga solo las columnas necesarias del archivo de datos.
+
+    Para .xlsx se recorre el libro con openpyxl en modo read_only en lugar
+    de dejar que pandas lo materialice entero: para listas de decenas de
+    miles de filas eso reduce el pico de memoria en un orden de magnitud.
+    Para .csv se leen únicamente las columnas usadas. Cacheada sobre los
+    bytes subidos para no re-parsear el archivo en cada rerun de Streamlit.
+    """
+    data_file = io.BytesIO(file_bytes)
+    if file_name.endswith(".xlsx"):
+        workbook = openpyxl.load_workbook(data_file, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return pd.DataFrame()
+
+            indices = {
+                name: i for i, name in enumerate(header) if name in DATA_COLUMNS
+            }
+            columns: Dict[str, List[Any]] = {name: [] for name in indices}
+            for row in rows:
+                for name, i in indices.items():
+                    columns[name].append(row[i] if i < len(row) else None)
+
+            return pd.DataFrame(columns)
+        finally:
+            workbook.close()
+
+    return pd.read_csv(
+        data_file, usecols=lambda col: col in DATA_COLUMNS, dtype="string"
+    )
+
+
 def validate_data(data: pd.DataFrame) -> bool:
-    """Valida que el DataFrame contenga las columnas necesarias."""
+    """Valida y sanea el DataFrame antes de generar.
+
+    Además de comprobar las columnas requeridas, elimina las filas sin
+    nombre (generarían un `Certificado - .pdf` vacío) y sufija los nombres
+    repetidos con un índice: dos filas iguales escribirían sobre el mismo
+    archivo y la conversión del primero sería trabajo perdido. Todo
+    vectorizado, sin recorrer filas en Python.
+    """
     required_columns = ["Nombre Completo"]
     missing_columns = [col for col in required_columns if col not in data.columns]
 
@@ -28,9 +99,50 @@ def validate_data(data: pd.DataFrame) -> bool:
             f"Faltan las siguientes columnas requeridas: {', '.join(missing_columns)}"
         )
         return False
+
+    # Descartar filas sin nombre
+    nombres = data["Nombre Completo"].fillna("").astype(str).str.strip()
+    empty = nombres == ""
+    if empty.any():
+        st.warning(f"Se omitirán {int(empty.sum())} filas sin 'Nombre Completo'.")
+        data.drop(index=data.index[empty], inplace=True)
+        nombres = nombres[~empty]
+
+    # Sufijar nombres repetidos para que no sobrescriban el mismo PDF
+    titled = nombres.str.title()
+    repeat_counts = titled.groupby(titled).cumcount()
+    duplicated = repeat_counts > 0
+    if duplicated.any():
+        st.info(
+            f"Hay {int(duplicated.sum())} nombres repetidos; se numerarán "
+            "para no sobrescribir certificados."
+        )
+        data.loc[duplicated, "Nombre Completo"] = (
+            titled[duplicated] + " (" + repeat_counts[duplicated].astype(str) + ")"
+        )
+
     return True
 
 
+def get_libreoffice_profile() -> str:
+    """Perfil de usuario de LibreOffice propio de la sesión actual.
+
+    Guardarlo en `st.session_state` (y no en una caché por proceso) evita
+    que dos sesiones generando a la vez pasen el mismo
+    `-env:UserInstallation` y serialicen sobre el lock del perfil; dentro
+    de la sesión las invocaciones secuenciales sí reutilizan el bootstrap.
+    Solo debe llamarse desde el hilo del script: los hilos consumidores de
+    la ruta de respaldo crean sus propios perfiles.
+    """
+    if "lo_profile_dir" not in st.session_state:
+        profile_dir = tempfile.mkdtemp(prefix="lo_profile_")
+        # Streamlit no ofrece un hook de fin de sesión; al menos que el
+        # perfil no sobreviva al proceso del servidor
+        atexit.register(shutil.rmtree, profile_dir, ignore_errors=True)
+        st.session_state["lo_profile_dir"] = profile_dir
+    return st.session_state["lo_profile_dir"]
+
+
 def convert_to_docx(input_path: str, output_dir: str) -> str:
     """Convierte un archivo .doc a .docx usando LibreOffice."""
     try:
@@ -41,6 +153,7 @@ def convert_to_docx(input_path: str, output_dir: str) -> str:
         result = subprocess.run(
             [
                 "libreoffice",
+                f"-env:UserInstallation=file://{get_libreoffice_profile()}",
                 "--headless",
                 "--convert-to",
                 "docx",
@@ -48,7 +161,8 @@ def convert_to_docx(input_path: str, output_dir: str) -> str:
                 "--outdir",
                 output_dir,
             ],
-            capture_output=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
             check=False,
         )
 
@@ -68,68 +182,476 @@ def convert_to_docx(input_path: str, output_dir: str) -> str:
         raise Exception(f"Error en la conversión del formato: {str(e)}")
 
 
+_DOCUMENT_XML = "word/document.xml"
+
+# Párrafo con salto de página que separa los certificados en el .docx combinado
+_PAGE_BREAK_XML = '<w:p><w:r><w:br w:type="page"/></w:r></w:p>'
+
+# Entorno afinado para renderizar en bucle: sin recargas ni desalojo de la
+# caché de plantillas compiladas. autoescape queda activo porque los valores
+# se insertan dentro de XML (un "&" sin escapar corrompería el documento).
+_jinja_env = jinja2.Environment(
+    autoescape=True,
+    auto_reload=False,
+    cache_size=-1,
+    optimized=True,
+    undefined=jinja2.ChainableUndefined,
+)
+
+# Plantillas ya compiladas, indexadas por el SHA-256 de su contenido
+_template_cache: Dict[
+    str, Tuple[List[Tuple[ZipInfo, bytes]], str, jinja2.Template]
+] = {}
+
+
+def _load_template(
+    template_path: str,
+) -> Tuple[List[Tuple[ZipInfo, bytes]], str, jinja2.Template]:
+    """Compila la plantilla una sola vez por contenido.
+
+    Solo `word/document.xml` cambia entre certificados, así que se extraen
+    todas las entradas del zip una vez, se normaliza el XML con el
+    `patch_xml` de docxtpl (repara las etiquetas partidas entre runs de
+    Word) y se compila una `jinja2.Template` reutilizable. Renderizar una
+    fila queda en sustituir dos cadenas, sin re-parsear el zip ni el XML.
+
+    La clave de caché es el SHA-256 de los bytes, no la ruta: la ruta vive
+    en un directorio temporal distinto en cada ejecución del script y
+    usarla como clave acumularía una entrada (con la plantilla descomprimida
+    entera) por generación durante toda la vida del servidor.
+    """
+    raw = Path(template_path).read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+
+    cached = _template_cache.get(digest)
+    if cached is None:
+        with ZipFile(io.BytesIO(raw)) as zipf:
+            entries = [(info, zipf.read(info.filename)) for info in zipf.infolist()]
+
+        xml = next(
+            data for info, data in entries if info.filename == _DOCUMENT_XML
+        ).decode("utf-8")
+        xml = DocxTemplate(template_path).patch_xml(xml)
+        template = _jinja_env.from_string(xml)
+
+        cached = _template_cache[digest] = (entries, xml, template)
+    return cached
+
+
+def _write_docx(
+    entries: List[Tuple[ZipInfo, bytes]], document_xml: bytes, docx_path: str
+) -> None:
+    """Escribe un .docx sustituyendo `word/document.xml` por el XML dado."""
+    buffer = io.BytesIO()
+    with ZipFile(buffer, "w") as zipf:
+        for info, data in entries:
+            if info.filename == _DOCUMENT_XML:
+                # Sin comprimir: el archivo es efímero y LibreOffice lo
+                # acepta igual, así se evita un pase de deflate por fila
+                zipf.writestr(
+                    info.filename, document_xml, compress_type=ZIP_STORED
+                )
+            else:
+                # Copia por llamada: writestr muta el ZipInfo (offset, CRC,
+                # filelist) y las entradas cacheadas se comparten entre
+                # sesiones; reutilizarlas tal cual corrompe los .docx
+                # cuando dos generaciones usan la misma plantilla a la vez
+                zipf.writestr(copy.copy(info), data)
+
+    # Volcar el zip completo con un único write() en lugar de la ráfaga de
+    # escrituras pequeñas (una por entrada) que genera ZipFile sobre disco
+    with open(docx_path, "wb") as output_file:
+        output_file.write(buffer.getbuffer())
+
+
+def _render_docx(
+    template_path: str, context: Dict[str, Any], docx_path: str
+) -> None:
+    """Renderiza un certificado reescribiendo solo `word/document.xml`."""
+    entries, _, template = _load_template(template_path)
+    rendered = template.render(context).encode("utf-8")
+    _write_docx(entries, rendered, docx_path)
+
+
+def create_combined_document(
+    template_path: str,
+    nombres: List[str],
+    cargos: List[str],
+    output_dir: str,
+) -> str:
+    """Renderiza todos los certificados en un único .docx multipágina.
+
+    Separa el interior de `<w:body>` de las propiedades de sección finales,
+    renderiza ese bloque una vez por participante y concatena los bloques
+    con saltos de página. El lote entero se convierte después con una sola
+    pasada de LibreOffice sobre un único documento grande.
+    """
+    entries, xml, _ = _load_template(template_path)
+
+    body_start = xml.index("<w:body>") + len("<w:body>")
+    body_end = xml.rindex("</w:body>")
+    inner = xml[body_start:body_end]
+
+    # El <w:sectPr> final (geometría de página) debe aparecer una sola vez
+    section_index = inner.rfind("<w:sectPr")
+    if section_index != -1:
+        content, section = inner[:section_index], inner[section_index:]
+    else:
+        content, section = inner, ""
+
+    body_template = _jinja_env.from_string(content)
+    pages = [
+        body_template.render({"nombre_completo": nombre, "cargo": cargo})
+        for nombre, cargo in zip(nombres, cargos)
+    ]
+    combined_xml = (
+        xml[:body_start] + _PAGE_BREAK_XML.join(pages) + section + xml[body_end:]
+    )
+
+    combined_path = os.path.join(output_dir, "Certificados_combinado.docx")
+    _write_docx(entries, combined_xml.encode("utf-8"), combined_path)
+    return combined_path
+
+
+def split_combined_pdf(
+    pdf_path: str, nombres: List[str], output_dir: str
+) -> List[Dict[str, str]]:
+    """Divide el PDF combinado en un archivo por participante.
+
+    Exige exactamente una página por certificado: si la plantilla ocupa
+    más de una página el reparto sería ambiguo, así que se lanza una
+    excepción y el llamador recurre a la ruta archivo por archivo.
+    """
+    reader = PdfReader(pdf_path)
+    if len(reader.pages) != len(nombres):
+        raise Exception(
+            f"El PDF combinado tiene {len(reader.pages)} páginas para "
+            f"{len(nombres)} participantes"
+        )
+
+    out_dir = Path(output_dir)
+    results = []
+    for nombre, page in zip(nombres, reader.pages):
+        writer = PdfWriter()
+        writer.add_page(page)
+        pdf_out = out_dir / f"Certificado - {nombre}.pdf"
+        with open(pdf_out, "wb") as output_file:
+            writer.write(output_file)
+        results.append(
+            {"status": "success", "file": str(pdf_out), "nombre": nombre}
+        )
+
+    return results
+
+
 def create_document(
-    doc: DocxTemplate, row: pd.Series, output_dir: str
+    template_path: str, nombre: str, cargo: str, output_dir: str
 ) -> Dict[str, str]:
-    """Crea un documento individual y lo convierte a PDF."""
+    """Renderiza el archivo Word de un participante.
+
+    La normalización de los datos se hace vectorizada en `create_documents`;
+    aquí solo llegan los valores finales. La conversión a PDF corre aparte
+    (ruta combinada o hilos consumidores) para no pagar un arranque de
+    LibreOffice por fila.
+    """
     try:
-        nombre = row.get("Nombre Completo", "").title()
         context = {
             "nombre_completo": nombre,
-            "cargo": row.get("Cargo", ""),
+            "cargo": cargo,
         }
 
         # Generar archivo Word
-        docx_path = os.path.join(output_dir, f"Certificado - {nombre}.docx")
-        doc.render(context)
-        doc.save(docx_path)
+        docx_path = Path(output_dir) / f"Certificado - {nombre}.docx"
+        _render_docx(template_path, context, str(docx_path))
 
-        # Convertir a PDF
-        pdf_path = os.path.join(output_dir, f"Certificado - {nombre}.pdf")
-        result = subprocess.run(
-            [
-                "libreoffice",
-                "--headless",
-                "--convert-to",
-                "pdf",
-                docx_path,
-                "--outdir",
-                output_dir,
-            ],
-            capture_output=True,
-            check=False,
+        return {"status": "success", "file": str(docx_path), "nombre": nombre}
+
+    except Exception as e:
+        logger.exception(f"Error al procesar documento para {nombre}")
+        return {"status": "error", "message": str(e), "nombre": nombre}
+
+
+@st.cache_resource
+def start_uno_server(port: int = UNO_PORT) -> subprocess.Popen:
+    """Arranca un soffice headless persistente para toda la sesión.
+
+    Mantener el proceso vivo evita pagar el arranque de LibreOffice en cada
+    conversión; `st.cache_resource` garantiza una sola instancia por servidor.
+    """
+    profile_dir = tempfile.mkdtemp(prefix="lo_uno_profile_")
+    # atexit es LIFO: primero se termina el proceso, después se borra
+    # su perfil
+    atexit.register(shutil.rmtree, profile_dir, ignore_errors=True)
+    process = subprocess.Popen(
+        [
+            "soffice",
+            f"-env:UserInstallation=file://{profile_dir}",
+            "--headless",
+            "--invisible",
+            "--norestore",
+            f"--accept=socket,host=localhost,port={port};urp;",
+        ]
+    )
+    atexit.register(process.terminate)
+    return process
+
+
+def _make_property(name: str, value: Any) -> "PropertyValue":
+    prop = PropertyValue()
+    prop.Name = name
+    prop.Value = value
+    return prop
+
+
+def _get_uno_desktop(port: int, timeout: float = 30.0) -> Any:
+    """Se conecta al soffice persistente, reintentando mientras arranca."""
+    local_context = uno.getComponentContext()
+    resolver = local_context.ServiceManager.createInstanceWithContext(
+        "com.sun.star.bridge.UnoUrlResolver", local_context
+    )
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            context = resolver.resolve(
+                f"uno:socket,host=localhost,port={port};urp;StarOffice.ComponentContext"
+            )
+            break
+        except Exception:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.5)
+
+    return context.ServiceManager.createInstanceWithContext(
+        "com.sun.star.frame.Desktop", context
+    )
+
+
+def _convert_with_uno(docx_paths: List[str], output_dir: str) -> None:
+    """Convierte los .docx a PDF reutilizando el soffice persistente."""
+    start_uno_server()
+    desktop = _get_uno_desktop(UNO_PORT)
+    load_props = (_make_property("Hidden", True),)
+    pdf_props = (_make_property("FilterName", "writer_pdf_Export"),)
+
+    for docx_path in docx_paths:
+        pdf_name = os.path.splitext(os.path.basename(docx_path))[0] + ".pdf"
+        pdf_path = os.path.join(output_dir, pdf_name)
+
+        document = desktop.loadComponentFromURL(
+            uno.systemPathToFileUrl(docx_path), "_blank", 0, load_props
         )
+        try:
+            document.storeToURL(uno.systemPathToFileUrl(pdf_path), pdf_props)
+        finally:
+            document.close(False)
 
-        if result.returncode != 0:
-            logger.error(f"Error al convertir a PDF: {result.stderr.decode()}")
-            return {"status": "error", "message": f"Error al convertir {nombre} a PDF"}
 
-        return {"status": "success", "file": pdf_path, "nombre": nombre}
+def convert_to_pdf(docx_paths: List[str], output_dir: str) -> None:
+    """Convierte todos los .docx a PDF con un solo arranque de LibreOffice.
 
-    except Exception as e:
+    Si python-uno está disponible se reutiliza el servidor persistente; si
+    no, se pasan todos los archivos en una única invocación por subprocess.
+    El perfil de usuario único evita colisiones con el lock de
+    `~/.config/libreoffice` cuando hay varias sesiones en paralelo.
+    """
+    if not docx_paths:
+        return
+
+    if UNO_AVAILABLE:
+        try:
+            _convert_with_uno(docx_paths, output_dir)
+            return
+        except Exception:
+            logger.exception(
+                "Falló la conversión vía UNO; usando libreoffice --convert-to"
+            )
+
+    result = subprocess.run(
+        [
+            "libreoffice",
+            f"-env:UserInstallation=file://{get_libreoffice_profile()}",
+            "--headless",
+            "--convert-to",
+            "pdf",
+            "--outdir",
+            output_dir,
+            *docx_paths,
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        check=False,
+    )
+
+    if result.returncode != 0:
+        error_msg = result.stderr.decode()
+        logger.error(f"Error al convertir a PDF: {error_msg}")
+        raise Exception(f"Error al convertir a PDF: {error_msg}")
+
+
+def create_documents(
+    template_path: str,
+    data: pd.DataFrame,
+    output_dir: str,
+    progress_bar: Any,
+    max_workers: Optional[int] = None,
+) -> List[Dict[str, str]]:
+    """Procesa todos los documentos y muestra el progreso.
+
+    Ruta principal: un solo .docx multipágina, una sola conversión de
+    LibreOffice y un reparto barato del PDF resultante. Si algo falla
+    (p. ej. certificados de más de una página), se recurre a la ruta
+    archivo por archivo con renderizado y conversión en tubería.
+    """
+    # Normalizar los datos de una vez con pandas en lugar de por fila
+    nombres = list(data["Nombre Completo"].fillna("").astype(str).str.title())
+    if "Cargo" in data.columns:
+        cargos = list(data["Cargo"].fillna("").astype(str))
+    else:
+        cargos = [""] * len(data)
+
+    try:
+        progress_bar.progress(0.1, text="Renderizando certificados...")
+        combined_docx = create_combined_document(
+            template_path, nombres, cargos, output_dir
+        )
+
+        progress_bar.progress(0.4, text="Convirtiendo a PDF...")
+        convert_to_pdf([combined_docx], output_dir)
+        combined_pdf = os.path.splitext(combined_docx)[0] + ".pdf"
+
+        progress_bar.progress(0.8, text="Separando certificados...")
+        results = split_combined_pdf(combined_pdf, nombres, output_dir)
+
+        progress_bar.progress(1.0, text="¡Proceso completado!")
+        return results
+    except Exception:
         logger.exception(
-            f"Error al procesar documento para {row.get('Nombre Completo', '')}"
+            "Falló la ruta combinada; generando certificados archivo por archivo"
         )
-        return {"status": "error", "message": str(e), "nombre": nombre}
 
+    return _create_documents_per_file(
+        template_path, nombres, cargos, output_dir, progress_bar, max_workers
+    )
 
-def create_documents(
-    template_path: str, data: pd.DataFrame, output_dir: str, progress_bar: Any
+
+def _create_documents_per_file(
+    template_path: str,
+    nombres: List[str],
+    cargos: List[str],
+    output_dir: str,
+    progress_bar: Any,
+    max_workers: Optional[int] = None,
 ) -> List[Dict[str, str]]:
-    """Procesa todos los documentos y muestra el progreso."""
-    doc = DocxTemplate(template_path)
-    total_files = len(data)
-    results = []
+    """Ruta de respaldo: renderizado y conversión solapados por una cola.
+
+    El hilo principal produce los .docx (renderizar es barato tras la
+    compilación de la plantilla) y `max_workers` hilos consumidores los
+    convierten a PDF según llegan: la espera del subprocess libera el GIL,
+    así que los hilos bastan. La cola acotada aplica contrapresión para que
+    los documentos pendientes no se acumulen sin límite, y un documento
+    dañado solo pierde su propio PDF.
+    """
+    total_files = len(nombres)
+    results: List[Dict[str, str]] = []
+    results_lock = threading.Lock()
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    work_queue: "queue.Queue[Optional[Dict[str, str]]]" = queue.Queue(
+        maxsize=max_workers * 2
+    )
 
-    for i, row in data.iterrows():
-        # Actualizar la barra de progreso
-        progress_text = f"Generando certificado {i+1} de {total_files}"
-        progress_bar.progress((i) / total_files, text=progress_text)
+    def consumer(profile_dir: str) -> None:
+        while True:
+            result = work_queue.get()
+            if result is None:
+                break
+
+            # El hilo no debe morir nunca: si lo hiciera, el productor se
+            # quedaría bloqueado para siempre en el put de la cola acotada
+            try:
+                process = subprocess.run(
+                    [
+                        "libreoffice",
+                        f"-env:UserInstallation=file://{profile_dir}",
+                        "--headless",
+                        "--convert-to",
+                        "pdf",
+                        "--outdir",
+                        output_dir,
+                        result["file"],
+                    ],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
+                    check=False,
+                )
+
+                pdf_path = Path(result["file"]).with_suffix(".pdf")
+                if process.returncode == 0 and pdf_path.exists():
+                    result["file"] = str(pdf_path)
+                else:
+                    logger.error(
+                        f"Error al convertir {result['file']} a PDF: "
+                        f"{process.stderr.decode()}"
+                    )
+                    result["status"] = "error"
+                    result["message"] = (
+                        f"Error al convertir {result['nombre']} a PDF"
+                    )
+            except Exception as e:
+                logger.exception(f"Error al convertir {result['file']} a PDF")
+                result["status"] = "error"
+                result["message"] = str(e)
+
+            with results_lock:
+                results.append(result)
+
+    # Dos soffice simultáneos no pueden compartir perfil: cada hilo
+    # consumidor recibe el suyo (sin tocar st.session_state, que no está
+    # disponible fuera del hilo del script); se eliminan tras el join
+    profile_dirs = [
+        tempfile.mkdtemp(prefix="lo_worker_profile_") for _ in range(max_workers)
+    ]
+    consumers = [
+        threading.Thread(target=consumer, args=(profile_dir,), daemon=True)
+        for profile_dir in profile_dirs
+    ]
+    for thread in consumers:
+        thread.start()
+
+    # Productor: renderiza y encola; la conversión avanza en paralelo.
+    # Primera mitad de la barra para el renderizado, segunda para el PDF.
+    scale = 2 * max(total_files, 1)
+    for i, (nombre, cargo) in enumerate(zip(nombres, cargos)):
+        result = create_document(template_path, nombre, cargo, output_dir)
+        if result["status"] == "error":
+            with results_lock:
+                results.append(result)
+        else:
+            work_queue.put(result)
 
-        # Crear documento
-        result = create_document(doc, row, output_dir)
-        results.append(result)
+        progress_text = f"Generando certificado {i+1} de {total_files}"
+        progress_bar.progress((i + 1) / scale, text=progress_text)
+
+    for _ in consumers:
+        work_queue.put(None)
+
+    # Esperar a los consumidores mostrando el avance de la conversión
+    while any(thread.is_alive() for thread in consumers):
+        with results_lock:
+            completed = min(len(results), total_files)
+        progress_bar.progress(
+            (total_files + completed) / scale,
+            text=f"Convirtiendo a PDF ({completed} de {total_files})...",
+        )
+        time.sleep(0.2)
+    for thread in consumers:
+        thread.join()
+    for profile_dir in profile_dirs:
+        shutil.rmtree(profile_dir, ignore_errors=True)
 
+    for result in results:
         if result["status"] == "error":
             st.warning(
                 f"Problema al generar certificado para {result.get('nombre', 'un participante')}: {result.get('message', '')}"
@@ -140,28 +662,85 @@ def create_documents(
     return results
 
 
-def create_zip_file(results: List[Dict[str, str]], output_dir: str) -> Optional[str]:
-    """Crea un archivo ZIP con los PDF generados exitosamente."""
+def create_zip_file(results: List[Dict[str, str]]) -> Optional[io.BytesIO]:
+    """Crea en memoria un archivo ZIP con los PDF generados exitosamente.
+
+    Construir el ZIP en un BytesIO evita escribirlo a disco y volver a
+    leerlo solo para entregárselo a `st.download_button`.
+    """
     successful_files = [r["file"] for r in results if r["status"] == "success"]
 
     if not successful_files:
         st.error("No se pudieron generar certificados para crear un archivo ZIP.")
         return None
 
-    zip_path = os.path.join(output_dir, "Certificados.zip")
     try:
-        with ZipFile(zip_path, "w") as zipf:
+        buffer = io.BytesIO()
+        # ZIP_STORED: los PDF ya vienen comprimidos, deflate solo quema CPU;
+        # strict_timestamps=False evita normalizar la fecha DOS por entrada
+        with ZipFile(
+            buffer,
+            "w",
+            compression=ZIP_STORED,
+            allowZip64=True,
+            strict_timestamps=False,
+        ) as zipf:
             for file_path in successful_files:
                 file_name = os.path.basename(file_path)
                 zipf.write(file_path, arcname=file_name)
 
-        return zip_path
+        buffer.seek(0)
+        return buffer
     except Exception as e:
         logger.exception("Error al crear archivo ZIP")
         st.error(f"Error al crear archivo ZIP: {str(e)}")
         return None
 
 
+class GenerationError(Exception):
+    """El lote no produjo ningún certificado utilizable."""
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def generate_certificates(
+    template_hash: str,
+    data_hash: str,
+    _template_path: str,
+    _data: pd.DataFrame,
+    _max_workers: Optional[int] = None,
+) -> Tuple[bytes, int, int]:
+    """Genera el lote completo y devuelve (bytes del ZIP, éxitos, fallos).
+
+    Cacheada por el SHA-256 de la plantilla y de los datos: Streamlit
+    re-ejecuta `main()` en cada interacción y, sin esta caché, un segundo
+    clic repetiría todo el trabajo de LibreOffice. Los argumentos con guion
+    bajo quedan fuera de la clave (la ruta temporal cambia entre reruns).
+
+    Un lote sin ningún éxito lanza `GenerationError` en lugar de devolver
+    un resultado: las excepciones no se cachean, así que un fallo
+    transitorio de LibreOffice no queda servido desde la caché durante una
+    hora y el usuario puede reintentar con solo volver a pulsar el botón.
+    """
+    with tempfile.TemporaryDirectory() as output_dir:
+        progress_bar = st.progress(0, text="Iniciando generación...")
+
+        results = create_documents(
+            _template_path, _data, output_dir, progress_bar, _max_workers
+        )
+
+        successful = sum(1 for r in results if r["status"] == "success")
+        failed = len(results) - successful
+
+        if successful == 0:
+            raise GenerationError("No se pudo generar ningún certificado")
+
+        zip_buffer = create_zip_file(results)
+        if zip_buffer is None:
+            raise GenerationError("No se pudo crear el archivo ZIP")
+
+        return zip_buffer.getvalue(), successful, failed
+
+
 def process_template_file(template_file, temp_dir: str) -> str:
     """Procesa el archivo de plantilla, convirtiendo de .doc a .docx si es necesario."""
     file_extension = os.path.splitext(template_file.name)[1].lower()
@@ -228,61 +807,73 @@ def main():
                 # Cargar datos
                 try:
                     with st.spinner("Cargando datos..."):
-                        if data_file.name.endswith(".xlsx"):
-                            data = pd.read_excel(data_file)
-                        else:
-                            data = pd.read_csv(data_file)
+                        data = load_data(data_file.getvalue(), data_file.name)
                 except Exception as e:
                     st.error(f"Error al cargar el archivo de datos: {str(e)}")
                     st.stop()
 
-                # Mostrar vista previa y validar datos
+                # Mostrar vista previa y validar datos; solo las primeras
+                # filas, serializar el DataFrame completo a Arrow en cada
+                # rerun es carísimo para listas grandes
                 st.subheader("Vista previa de los datos:")
-                st.dataframe(data, height=200)
+                st.dataframe(data.head(50), height=200)
+                if len(data) > 50:
+                    st.caption(f"Mostrando 50 de {len(data)} filas.")
 
                 if not validate_data(data):
                     st.stop()
 
                 st.info(f"Se generarán certificados para {len(data)} participantes.")
 
+                # Grado de paralelismo para la conversión; con una sola CPU
+                # el slider no tiene rango válido (min debe ser < max)
+                cpu_total = os.cpu_count() or 1
+                if cpu_total > 1:
+                    max_workers = st.slider(
+                        "Procesos en paralelo ⚙️",
+                        min_value=1,
+                        max_value=cpu_total,
+                        value=cpu_total,
+                        help="Número de procesos simultáneos para generar los certificados.",
+                    )
+                else:
+                    max_workers = 1
+
                 # Generar botón y manejo de la generación
                 if st.button("Generar Certificados", type="primary"):
                     with st.spinner("Generando certificados..."):
-                        # Crear barra de progreso
-                        progress_bar = st.progress(0, text="Iniciando generación...")
-
-                        # Generar documentos
-                        results = create_documents(
-                            template_path, data, temp_dir, progress_bar
-                        )
-
-                        # Estadísticas de resultados
-                        successful = sum(1 for r in results if r["status"] == "success")
-                        failed = len(results) - successful
-
-                        # Crear ZIP con los archivos exitosos
-                        if successful > 0:
-                            zip_path = create_zip_file(results, temp_dir)
-
-                            if zip_path:
-                                st.success(
-                                    f"✅ {successful} certificados generados exitosamente."
-                                )
-                                if failed > 0:
-                                    st.warning(
-                                        f"⚠️ {failed} certificados no pudieron ser generados."
-                                    )
-
-                                # Botón de descarga
-                                with open(zip_path, "rb") as zipf:
-                                    st.download_button(
-                                        label="📥 Descargar todos los certificados",
-                                        data=zipf,
-                                        file_name="Certificados.zip",
-                                        mime="application/zip",
-                                    )
-                        else:
+                        # Clave de caché: mismo par plantilla+datos => mismo ZIP
+                        template_hash = hashlib.sha256(
+                            template_file.getbuffer()
+                        ).hexdigest()
+                        data_hash = hashlib.sha256(data_file.getvalue()).hexdigest()
+
+                        try:
+                            zip_bytes, successful, failed = generate_certificates(
+                                template_hash,
+                                data_hash,
+                                template_path,
+                                data,
+                                max_workers,
+                            )
+                        except GenerationError:
                             st.error("No se pudo generar ningún certificado.")
+                        else:
+                            st.success(
+                                f"✅ {successful} certificados generados exitosamente."
+                            )
+                            if failed > 0:
+                                st.warning(
+                                    f"⚠️ {failed} certificados no pudieron ser generados."
+                                )
+
+                            # Botón de descarga
+                            st.download_button(
+                                label="📥 Descargar todos los certificados",
+                                data=zip_bytes,
+                                file_name="Certificados.zip",
+                                mime="application/zip",
+                            )
 
         except Exception as e:
             logger.exception("Error en el procesamiento principal")